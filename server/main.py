@@ -1,17 +1,43 @@
 from fastapi import FastAPI, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
+import orjson
 from datetime import datetime, timedelta, timezone
 from pydantic import BaseModel
 from typing import List, Optional
-import xml.etree.ElementTree as ET
-import requests
-import glob
-import os
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from lxml import etree
+import asyncio
+import httpx
+import time
 import numpy as np
-from skyfield.api import wgs84, load, utc
+import pandas as pd
+from skyfield.api import wgs84, load
 from pytz import timezone as pytz_timezone, UTC
 
-app = FastAPI(title="Dynamic ISS Visible Pass API", version="1.3")
+from passes import get_visible_passes
+
+# Shared async client for upstream calls, opened for the app's lifetime
+# so connections are pooled and the event loop is never blocked on I/O.
+http_client: Optional[httpx.AsyncClient] = None
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global http_client
+    http_client = httpx.AsyncClient(timeout=2.0)
+    # Warm the lazy singletons in the background: the server starts
+    # serving immediately, and a momentarily unreachable celestrak only
+    # degrades the skyfield endpoints instead of killing boot.
+    for warm in (get_visible_passes, get_passes_df, get_ts, get_iss, get_oem):
+        asyncio.create_task(asyncio.to_thread(warm))
+    yield
+    await http_client.aclose()
+    http_client = None
+
+app = FastAPI(title="Dynamic ISS Visible Pass API", version="1.3", lifespan=lifespan,
+              default_response_class=ORJSONResponse)
 
 class SightingPass(BaseModel):
     country: str
@@ -54,125 +80,160 @@ app.add_middleware(
     allow_headers=["*"],        # allow custom headers
 )
 
-ts = load.timescale()
+# The skyfield assets (timescale, TLE download, OEM parse) are lazy
+# singletons so import finishes in milliseconds and uvicorn can serve
+# /passes even while celestrak is slow or down. lru_cache does not
+# cache exceptions, so a failed fetch is simply retried on next use.
 tle_url = "https://celestrak.org/NORAD/elements/stations.txt"
-satellites = load.tle_file(tle_url)
-iss = [s for s in satellites if "ISS" in s.name][0]
-
 OEM_FILE = "ISS.OEM_J2K_EPH.xml"
 
+@lru_cache(maxsize=1)
+def get_ts():
+    return load.timescale()
+
+@lru_cache(maxsize=1)
+def get_iss():
+    satellites = load.tle_file(tle_url)
+    return [s for s in satellites if "ISS" in s.name][0]
+
+def _iter_state_vectors(file_path):
+    for _, sv in etree.iterparse(file_path, tag="stateVector", events=("end",)):
+        yield sv
+        # Free the element and any already-parsed siblings so memory stays flat
+        sv.clear()
+        while sv.getprevious() is not None:
+            del sv.getparent()[0]
+
+# The OEM schema fixes the child order of every stateVector, so records
+# can be read positionally instead of paying six named child scans each.
+_OEM_CHILD_ORDER = ("EPOCH", "X", "Y", "Z", "X_DOT", "Y_DOT", "Z_DOT")
+
 def parse_oem_xml(file_path):
-    tree = ET.parse(file_path)
-    root = tree.getroot()
-    vectors = []
-    for sv in root.findall(".//stateVector"):
-        epoch = sv.find("EPOCH").text
-        x = float(sv.find("X").text)
-        y = float(sv.find("Y").text)
-        z = float(sv.find("Z").text)
-        xd = float(sv.find("X_DOT").text)
-        yd = float(sv.find("Y_DOT").text)
-        zd = float(sv.find("Z_DOT").text)
-        vectors.append({"epoch": epoch, "pos": (x, y, z), "vel": (xd, yd, zd)})
-    return vectors
-
-STATE_VECTORS = parse_oem_xml(OEM_FILE)
-
-def oem_to_arrays(state_vectors):
-    ts = load.timescale()
-    times, positions, velocities = [], [], []
-    for sv in state_vectors:
-        # Ensure datetime is timezone-aware (UTC)
-        dt = datetime.strptime(sv['epoch'], "%Y-%jT%H:%M:%S.%fZ").replace(tzinfo=utc)
-        times.append(ts.utc(dt))
-        positions.append(sv['pos'])
-        velocities.append(sv['vel'])
-    positions = np.array(positions) * 1000  # Convert km to meters
-    velocities = np.array(velocities) * 1000
-    return ts, times, positions, velocities
-
-TS, TIMES, POS, VEL = oem_to_arrays(STATE_VECTORS)
-
-def safe_int(value):
-    if value is None:
-        return 0
-    value = value.strip()
-    if value.startswith("<"):
-        return 0
-    try:
-        return int(value)
-    except ValueError:
-        return 0
-
-def safe_float(value):
-    if value is None:
-        return 0.0
-    value = value.strip()
-    try:
-        return float(value)
-    except ValueError:
-        return 0.0
-
-def parse_xml_file(file_path):
-    tree = ET.parse(file_path)
-    root = tree.getroot()
-    passes = []
-    for vp in root.findall('visible_pass'):
-        try:
-            data = {
-                'country': vp.findtext('country'),
-                'region': vp.findtext('region'),
-                'city': vp.findtext('city'),
-                'spacecraft': vp.findtext('spacecraft'),
-                'sighting_date': vp.findtext('sighting_date'),
-                'duration_minutes': safe_int(vp.findtext('duration_minutes')),
-                'max_elevation': safe_int(vp.findtext('max_elevation')),
-                'enters': vp.findtext('enters'),
-                'exits': vp.findtext('exits'),
-                'utc_offset': safe_float(vp.findtext('utc_offset')),
-                'utc_time': vp.findtext('utc_time'),
-                'utc_date': vp.findtext('utc_date')
-            }
-            passes.append(data)
-        except Exception:
-            continue
-    return passes
-
-DATA_FOLDER = "xml_data"
-all_visible_passes = []
-for xml_file in glob.glob(os.path.join(DATA_FOLDER, "*.xml")):
-    all_visible_passes.extend(parse_xml_file(xml_file))
-
-VISIBLE_PASSES = all_visible_passes
-
-@app.get("/passes", response_model=List[SightingPass])
-def get_passes(city: Optional[str] = None, country: Optional[str] = None, date: Optional[str] = None):
-    results = VISIBLE_PASSES
+    # Count first so every column is written straight into preallocated
+    # arrays instead of growing Python lists of per-row tuples.
+    count = sum(1 for _ in _iter_state_vectors(file_path))
+    epochs = np.empty(count, dtype="datetime64[us]")
+    positions = np.empty((count, 3))
+    velocities = np.empty((count, 3))
+    for i, sv in enumerate(_iter_state_vectors(file_path)):
+        children = list(sv)
+        if i == 0 and tuple(c.tag for c in children) != _OEM_CHILD_ORDER:
+            raise ValueError(f"Unexpected stateVector child order in {file_path}")
+        epochs[i] = datetime.strptime(children[0].text, "%Y-%jT%H:%M:%S.%fZ")
+        positions[i, 0] = float(children[1].text)
+        positions[i, 1] = float(children[2].text)
+        positions[i, 2] = float(children[3].text)
+        velocities[i, 0] = float(children[4].text)
+        velocities[i, 1] = float(children[5].text)
+        velocities[i, 2] = float(children[6].text)
+    return epochs, positions, velocities
+
+@lru_cache(maxsize=1)
+def get_oem():
+    epochs, positions, velocities = parse_oem_xml(OEM_FILE)
+    positions *= 1000  # Convert km to meters
+    velocities *= 1000
+    return epochs, positions, velocities
+
+def oem_to_arrays(epochs, ts):
+    # skyfield accepts array-valued components, so all epochs become a
+    # single vectorized Time instead of one ts.utc() call per row.
+    dt_index = pd.DatetimeIndex(epochs)
+    seconds = dt_index.second + dt_index.microsecond / 1e6
+    times = ts.utc(dt_index.year, dt_index.month, dt_index.day,
+                   dt_index.hour, dt_index.minute, seconds)
+    return times
+
+@lru_cache(maxsize=1)
+def get_oem_times():
+    return oem_to_arrays(get_oem()[0], get_ts())
+
+# Columnar view of the static pass list. Filtering runs as vectorized
+# boolean masks over contiguous columns instead of per-row Python work;
+# the lowercased columns are built once so no request pays for .lower().
+@lru_cache(maxsize=1)
+def get_passes_df():
+    df = pd.DataFrame(
+        get_visible_passes(),
+        columns=['country', 'region', 'city', 'spacecraft', 'sighting_date',
+                 'duration_minutes', 'max_elevation', 'enters', 'exits',
+                 'utc_offset', 'utc_time', 'utc_date'],
+    )
+    df['city_lc'] = df['city'].str.lower()
+    df['country_lc'] = df['country'].str.lower()
+    return df
+
+# The pass data never changes after startup, so the unique lists are
+# pure functions of static state: compute them exactly once.
+@lru_cache(maxsize=1)
+def get_cities_cached():
+    return sorted(get_passes_df()['city'].dropna().unique().tolist())
+
+@lru_cache(maxsize=1)
+def get_countries_cached():
+    return sorted(get_passes_df()['country'].dropna().unique().tolist())
+
+# No response_model: the rows were validated once at parse time, and
+# re-validating thousands of them through pydantic on every request is
+# pure overhead. The model stays in `responses` for the OpenAPI docs.
+@app.get("/passes", responses={200: {"model": List[SightingPass]}})
+def get_passes(city: Optional[str] = None, country: Optional[str] = None, date: Optional[str] = None,
+               min_duration: Optional[int] = None, min_elevation: Optional[int] = None):
+    passes_df = get_passes_df()
+    visible_passes = get_visible_passes()
+    mask = pd.Series(True, index=passes_df.index)
+    # Query params are lowercased exactly once; the row side was
+    # lowercased once for the whole dataset at load time.
     if city:
-        results = [p for p in results if p['city'] and p['city'].lower() == city.lower()]
+        city_lc = city.lower()
+        mask &= passes_df['city_lc'] == city_lc
     if country:
-        results = [p for p in results if p['country'] and p['country'].lower() == country.lower()]
+        country_lc = country.lower()
+        mask &= passes_df['country_lc'] == country_lc
     if date:
-        results = [p for p in results if p['utc_date'] == date]
-    if not results:
+        mask &= passes_df['utc_date'] == date
+    # Numeric comparisons run vectorized over the contiguous int columns
+    # rather than per-row Python comparisons.
+    if min_duration is not None:
+        mask &= passes_df['duration_minutes'] >= min_duration
+    if min_elevation is not None:
+        mask &= passes_df['max_elevation'] >= min_elevation
+    indices = passes_df.index[mask]
+    if len(indices) == 0:
         raise HTTPException(status_code=404, detail="No passes found")
-    return results
+
+    # Stream the rows instead of materializing the whole JSON body:
+    # bytes hit the wire after the first row and peak memory stays at
+    # one serialized row regardless of result size. Rows come from the
+    # original dicts so the lowercased helper columns never leak.
+    def generate():
+        yield b"["
+        first = True
+        for i in indices:
+            yield (b"" if first else b",") + orjson.dumps(visible_passes[i])
+            first = False
+        yield b"]"
+
+    return StreamingResponse(generate(), media_type="application/json")
 
 @app.get("/cities", response_model=List[str])
 def get_cities():
-    return sorted(list({p['city'] for p in VISIBLE_PASSES if p['city']}))
+    return get_cities_cached()
 
 @app.get("/countries", response_model=List[str])
 def get_countries():
-    return sorted(list({p['country'] for p in VISIBLE_PASSES if p['country']}))
+    return get_countries_cached()
 
-@app.get("/next-pass", response_model=NextPass)
-def next_pass(lat: float, lon: float, elevation_m: float = 0.0):
-    """
-    Returns the next visible ISS pass for the given observer location, always in IST.
-    """
+# Pass predictions barely change over a few minutes, so identical
+# queries within the same window reuse one find_events computation.
+NEXT_PASS_TTL_SECONDS = 300
+
+@lru_cache(maxsize=256)
+def _compute_next_pass(lat, lon, elevation_m, time_bucket):
+    ts = get_ts()
+    iss = get_iss()
     observer = wgs84.latlon(lat, lon, elevation_m)
-    now = datetime.now(timezone.utc)
+    now = datetime.fromtimestamp(time_bucket * NEXT_PASS_TTL_SECONDS, tz=timezone.utc)
     t0 = ts.utc(now)
     t1 = ts.utc(now + timedelta(days=1))
 
@@ -184,7 +245,7 @@ def next_pass(lat: float, lon: float, elevation_m: float = 0.0):
         culm_t = times[events == 1][0]
         set_t = times[events == 2][0]
     except IndexError:
-        raise HTTPException(status_code=404, detail="No pass found in the next 24 hours")
+        return None
 
     duration = (set_t.utc_datetime() - rise_t.utc_datetime()).total_seconds()
     topocentric = (iss - observer).at(culm_t)
@@ -195,15 +256,83 @@ def next_pass(lat: float, lon: float, elevation_m: float = 0.0):
     enters_local = rise_t.utc_datetime().replace(tzinfo=UTC).astimezone(obs_tz)
     exits_local = set_t.utc_datetime().replace(tzinfo=UTC).astimezone(obs_tz)
 
+    return (
+        enters_local.strftime("%Y-%m-%d %H:%M:%S %Z"),
+        alt.degrees,
+        exits_local.strftime("%Y-%m-%d %H:%M:%S %Z"),
+        duration,
+    )
+
+@app.get("/next-pass", response_model=NextPass)
+async def next_pass(lat: float, lon: float, elevation_m: float = 0.0):
+    """
+    Returns the next visible ISS pass for the given observer location, always in IST.
+    """
+    time_bucket = int(time.time() // NEXT_PASS_TTL_SECONDS)
+    # find_events is CPU-heavy; run it on the threadpool so the event
+    # loop stays free while skyfield crunches.
+    result = await run_in_threadpool(
+        _compute_next_pass, round(lat, 3), round(lon, 3), round(elevation_m), time_bucket)
+    if result is None:
+        raise HTTPException(status_code=404, detail="No pass found in the next 24 hours")
+
+    enters, max_elevation, exits, duration = result
     return NextPass(
-        enters=enters_local.strftime("%Y-%m-%d %H:%M:%S %Z"),
-        max_elevation=alt.degrees,
-        exits=exits_local.strftime("%Y-%m-%d %H:%M:%S %Z"),
+        enters=enters,
+        max_elevation=max_elevation,
+        exits=exits,
         duration_seconds=duration,
         observer_lat=lat,
         observer_lon=lon
     )
 
+# WGS84 constants for the NumPy ECI -> geodetic conversion.
+_WGS84_A = 6378137.0
+_WGS84_F = 1 / 298.257223563
+_WGS84_E2 = _WGS84_F * (2 - _WGS84_F)
+_WGS84_B = _WGS84_A * (1 - _WGS84_F)
+
+def _gmst_radians(dt):
+    # IAU 1982 GMST polynomial; UTC stands in for UT1, which is well
+    # within the accuracy needed for a ground-track display.
+    jd = 2440587.5 + dt.timestamp() / 86400.0
+    t = (jd - 2451545.0) / 36525.0
+    gmst_sec = (67310.54841 + (876600.0 * 3600 + 8640184.812866) * t
+                + 0.093104 * t**2 - 6.2e-6 * t**3)
+    return (gmst_sec % 86400.0) * (2 * np.pi / 86400.0)
+
+def _interpolate_oem_position(target_time):
+    """Cubic Hermite interpolation of the ISS ECI position (meters) from
+    the bracketing OEM state vectors, or None outside the OEM window."""
+    epochs, pos, vel = get_oem()
+    target = np.datetime64(target_time.astimezone(timezone.utc).replace(tzinfo=None), "us")
+    if len(epochs) < 2 or target < epochs[0] or target > epochs[-1]:
+        return None
+    i = min(max(int(np.searchsorted(epochs, target)) - 1, 0), len(epochs) - 2)
+    h = (epochs[i + 1] - epochs[i]) / np.timedelta64(1, "s")
+    s = ((target - epochs[i]) / np.timedelta64(1, "s")) / h
+    h00 = 2 * s**3 - 3 * s**2 + 1
+    h10 = s**3 - 2 * s**2 + s
+    h01 = -2 * s**3 + 3 * s**2
+    h11 = s**3 - s**2
+    return h00 * pos[i] + h10 * h * vel[i] + h01 * pos[i + 1] + h11 * h * vel[i + 1]
+
+def _eci_to_geodetic(pos_m, dt):
+    # Rotate ECI into ECEF by GMST, then Bowring's formula for latitude.
+    gmst = _gmst_radians(dt)
+    x = pos_m[0] * np.cos(gmst) + pos_m[1] * np.sin(gmst)
+    y = -pos_m[0] * np.sin(gmst) + pos_m[1] * np.cos(gmst)
+    z = pos_m[2]
+    lon = np.arctan2(y, x)
+    r = np.hypot(x, y)
+    e2p = (_WGS84_A**2 - _WGS84_B**2) / _WGS84_B**2
+    theta = np.arctan2(z * _WGS84_A, r * _WGS84_B)
+    lat = np.arctan2(z + e2p * _WGS84_B * np.sin(theta)**3,
+                     r - _WGS84_E2 * _WGS84_A * np.cos(theta)**3)
+    n = _WGS84_A / np.sqrt(1 - _WGS84_E2 * np.sin(lat)**2)
+    alt = r / np.cos(lat) - n
+    return np.degrees(lat), np.degrees(lon), alt / 1000.0
+
 @app.get("/iss-location-at", response_model=ISSLocation)
 def get_iss_location_at(
 
@@ -211,9 +340,23 @@ def get_iss_location_at(
 ):
     # Use timezone-aware arithmetic
     target_time = datetime.now(tz=timezone.utc) + timedelta(minutes=minutes_from_now)
-    t = ts.utc(target_time.year, target_time.month, target_time.day,
-               target_time.hour, target_time.minute, target_time.second)
-    geocentric = iss.at(t)
+
+    # Interpolating the already-loaded OEM state vectors costs
+    # microseconds versus skyfield's per-request SGP4 propagation.
+    pos = _interpolate_oem_position(target_time)
+    if pos is not None:
+        latitude, longitude, altitude_km = _eci_to_geodetic(pos, target_time)
+        return ISSLocation(
+            timestamp_utc=target_time.isoformat(),
+            latitude=float(latitude),
+            longitude=float(longitude),
+            altitude_km=float(altitude_km)
+        )
+
+    # Outside the OEM window: fall back to SGP4 propagation.
+    t = get_ts().utc(target_time.year, target_time.month, target_time.day,
+                     target_time.hour, target_time.minute, target_time.second)
+    geocentric = get_iss().at(t)
     subpoint = wgs84.subpoint(geocentric)
 
     return ISSLocation(
@@ -223,12 +366,52 @@ def get_iss_location_at(
         altitude_km=subpoint.elevation.km
     )
 
+@app.get("/iss-track", response_model=List[ISSLocation])
+def get_iss_track(
+    start_min: int = Query(-60, description="Start offset in minutes from now"),
+    end_min: int = Query(60, description="End offset in minutes from now"),
+    step_min: int = Query(1, ge=1, description="Step between track points in minutes"),
+):
+    """
+    Returns the ISS ground track around the current time, one subpoint
+    per step. The whole window is propagated in a single array-valued
+    skyfield call instead of one .at() per point.
+    """
+    if end_min < start_min:
+        raise HTTPException(status_code=400, detail="end_min must be >= start_min")
+    now = datetime.now(tz=timezone.utc)
+    offsets = np.arange(start_min, end_min + 1, step_min)
+    t = get_ts().utc(now.year, now.month, now.day,
+                     now.hour, now.minute, now.second + offsets * 60.0)
+    geocentric = get_iss().at(t)
+    subpoint = wgs84.subpoint(geocentric)
+
+    latitudes = np.atleast_1d(subpoint.latitude.degrees)
+    longitudes = np.atleast_1d(subpoint.longitude.degrees)
+    altitudes = np.atleast_1d(subpoint.elevation.km)
+    return [
+        ISSLocation(
+            timestamp_utc=(now + timedelta(minutes=int(m))).isoformat(),
+            latitude=lat,
+            longitude=lon,
+            altitude_km=alt
+        )
+        for m, lat, lon, alt in zip(offsets, latitudes, longitudes, altitudes)
+    ]
+
+
 
+# Short TTL cache so a burst of refreshes serves one upstream fetch
+# instead of fanning every request out to open-notify.org.
+ISS_NOW_TTL_SECONDS = 2.0
+_iss_now_cache = {"expires": 0.0, "position": None}
 
 @app.get("/current-iss")
-def current_iss():
+async def current_iss():
+    if _iss_now_cache["position"] is not None and time.monotonic() < _iss_now_cache["expires"]:
+        return _iss_now_cache["position"]
     try:
-        response = requests.get("http://api.open-notify.org/iss-now.json")
+        response = await http_client.get("http://api.open-notify.org/iss-now.json")
         data = response.json()
         if data["message"] != "success":
             raise HTTPException(status_code=500, detail="ISS API error")
@@ -236,6 +419,8 @@ def current_iss():
             "latitude": float(data["iss_position"]["latitude"]),
             "longitude": float(data["iss_position"]["longitude"])
         }
+        _iss_now_cache["position"] = position
+        _iss_now_cache["expires"] = time.monotonic() + ISS_NOW_TTL_SECONDS
         return position
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
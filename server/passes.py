@@ -0,0 +1,86 @@
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from lxml import etree
+import glob
+import hashlib
+import os
+import pickle
+import re
+
+DATA_FOLDER = "xml_data"
+CACHE_FOLDER = "cache"
+
+# Validate with cheap string checks instead of try/except: these run
+# for every field of every record during the parse loop, and raising
+# ValueError on dirty values (e.g. "< 1") is far costlier than a match.
+_FLOAT_RE = re.compile(r"^-?\d+(\.\d+)?$")
+
+def safe_int(value):
+    if not value:
+        return 0
+    value = value.strip()
+    digits = value[1:] if value[:1] == "-" else value
+    return int(value) if digits.isdigit() else 0
+
+def safe_float(value):
+    if not value:
+        return 0.0
+    value = value.strip()
+    return float(value) if _FLOAT_RE.match(value) else 0.0
+
+def parse_xml_file(file_path):
+    passes = []
+    for _, vp in etree.iterparse(file_path, tag='visible_pass', events=('end',)):
+        try:
+            data = {
+                'country': vp.findtext('country'),
+                'region': vp.findtext('region'),
+                'city': vp.findtext('city'),
+                'spacecraft': vp.findtext('spacecraft'),
+                'sighting_date': vp.findtext('sighting_date'),
+                'duration_minutes': safe_int(vp.findtext('duration_minutes')),
+                'max_elevation': safe_int(vp.findtext('max_elevation')),
+                'enters': vp.findtext('enters'),
+                'exits': vp.findtext('exits'),
+                'utc_offset': safe_float(vp.findtext('utc_offset')),
+                'utc_time': vp.findtext('utc_time'),
+                'utc_date': vp.findtext('utc_date')
+            }
+            passes.append(data)
+        except Exception:
+            continue
+        finally:
+            vp.clear()
+            while vp.getprevious() is not None:
+                del vp.getparent()[0]
+    return passes
+
+def _passes_cache_path(files):
+    # Key the cache on every input file's name, mtime and size so any
+    # change to the XML corpus invalidates it automatically.
+    key = tuple(sorted((f, os.path.getmtime(f), os.path.getsize(f)) for f in files))
+    key_hash = hashlib.sha1(repr(key).encode()).hexdigest()
+    return os.path.join(CACHE_FOLDER, f"passes-{key_hash}.pkl")
+
+def load_visible_passes(files):
+    cache_path = _passes_cache_path(files)
+    if os.path.exists(cache_path):
+        with open(cache_path, "rb") as f:
+            return pickle.load(f)
+    passes = []
+    if files:
+        # One file per task; results are simply concatenated, so parsing
+        # scales across cores instead of running file-by-file.
+        with ProcessPoolExecutor() as executor:
+            for file_passes in executor.map(parse_xml_file, files, chunksize=4):
+                passes.extend(file_passes)
+    os.makedirs(CACHE_FOLDER, exist_ok=True)
+    with open(cache_path, "wb") as f:
+        pickle.dump(passes, f)
+    return passes
+
+@lru_cache(maxsize=1)
+def get_visible_passes():
+    # Lazy singleton: nothing is globbed or parsed at import time, the
+    # first caller (or the lifespan warm-up) pays for the load once.
+    return load_visible_passes(glob.glob(os.path.join(DATA_FOLDER, "*.xml")))